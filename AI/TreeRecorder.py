@@ -10,4 +10,14 @@ class TreeRecorder:
         self.lines.append((level, f"{label} | col={col} | val={value}{ab}"))
 
     def prune(self, level, alpha, beta):
-        self.lines.append((level, f"PRUNED | a={alpha} | b={beta}"))
\ No newline at end of file
+        self.lines.append((level, f"PRUNED | a={alpha} | b={beta}"))
+
+
+class NullRecorder(TreeRecorder):
+    """Recorder that drops everything, for searches nobody will inspect."""
+
+    def node(self, level, label, col, value, alpha=None, beta=None):
+        pass
+
+    def prune(self, level, alpha, beta):
+        pass
@@ -0,0 +1,147 @@
+"""Stream positions through a pool of Minimax workers and print JSON lines.
+
+Input is one position per line: a move string of 0-based columns ("3324") or a
+64-bit key ("key:0x1f"). Blank lines and lines starting with '#' are skipped.
+
+    python analyse.py positions.txt --depth 6 --workers 4
+    cat positions.txt | python analyse.py --movetime 200 --unordered
+
+Each output line holds index, position, best, score, nodes and time (seconds);
+scores are from the side to move. Only a small window of positions is in
+flight at once, so memory stays bounded however long the input is.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from engine import format_score, TT_ENTRY_BYTES
+from minimax import Minimax
+from analysis_cache import AnalysisCache
+from tablebase import Tablebase
+from position import parse_position, side_to_move, oriented
+from TreeRecorder import NullRecorder
+
+# per-worker search state, kept warm between positions
+_minimax = None
+
+
+def json_score(value):
+    # JSON has no infinity, so proven results are reported as "win"/"loss"
+    if value is None or abs(value) == math.inf:
+        return format_score(value) if value is not None else None
+    return int(value)
+
+
+def init_worker(hash_mb, cache_path=None, tablebase_path=None):
+    global _minimax
+    _minimax = Minimax(NullRecorder(), AnalysisCache(cache_path) if cache_path else None,
+                       Tablebase(tablebase_path) if tablebase_path else None)
+    _minimax.max_tt_entries = hash_mb * 1024 * 1024 // TT_ENTRY_BYTES if hash_mb > 0 else None
+
+
+def analyse_position(index, text, rows, cols, depth, movetime):
+    result = {"index": index, "position": text}
+    try:
+        board = parse_position(text, rows, cols)
+    except ValueError as e:
+        result["error"] = str(e)
+        return result
+
+    if board.check_winner() is not None or board.is_full():
+        result.update(best=None, score=None, nodes=0, time=0.0)
+        return result
+
+    board = oriented(board, side_to_move(board))
+    empty = board.rows * board.cols - board.ply
+    max_depth = min(depth if depth else rows * cols, empty)
+
+    start = time.time()
+    value, move = _minimax.find_best_move(board, max_depth, True, movetime)
+    result.update(best=move, score=json_score(value), nodes=_minimax.nodes,
+                  time=round(time.time() - start, 4))
+    return result
+
+
+def read_positions(stream):
+    index = 0
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        yield index, line
+        index += 1
+
+
+def run(positions, out, rows=6, cols=7, depth=None, movetime=None, workers=None,
+        ordered=True, hash_mb=64, cache_path=None, tablebase_path=None):
+    workers = workers or os.cpu_count() or 1
+    window = workers * 4
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(hash_mb, cache_path, tablebase_path)) as pool:
+        pending = deque() if ordered else set()
+
+        def emit(future):
+            out.write(json.dumps(future.result()) + "\n")
+            out.flush()
+
+        for index, text in positions:
+            if len(pending) >= window:
+                if ordered:
+                    emit(pending.popleft())
+                else:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for f in done:
+                        emit(f)
+            future = pool.submit(analyse_position, index, text, rows, cols, depth, movetime)
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+
+        if ordered:
+            while pending:
+                emit(pending.popleft())
+        else:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    emit(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk Connect 4 position analysis")
+    parser.add_argument("file", nargs="?", help="positions file (default: stdin)")
+    parser.add_argument("--depth", type=int, help="fixed search depth per position")
+    parser.add_argument("--movetime", type=int, help="time per position in milliseconds")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--unordered", action="store_true", help="emit results as they complete")
+    parser.add_argument("--hash", type=int, default=64, help="transposition table MB per worker")
+    parser.add_argument("--cache", help="persistent analysis cache (sqlite file) shared by workers")
+    parser.add_argument("--tablebase", help="tablebase file for the board size (see tablebase.py)")
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--cols", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    # 0 would otherwise mean "no limit" and search the whole board
+    if args.depth is not None and args.depth <= 0:
+        parser.error("--depth must be positive")
+    if args.movetime is not None and args.movetime <= 0:
+        parser.error("--movetime must be positive")
+    if args.depth is None and args.movetime is None:
+        args.depth = 6
+    movetime = args.movetime / 1000.0 if args.movetime is not None else None
+
+    stream = open(args.file, encoding="utf-8") if args.file else sys.stdin
+    try:
+        run(read_positions(stream), sys.stdout, args.rows, args.cols, args.depth, movetime,
+            args.workers, not args.unordered, args.hash, args.cache, args.tablebase)
+    finally:
+        if args.file:
+            stream.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import sqlite3
+
+DEFAULT_PATH = "analysis_cache.db"
+SCHEMA_VERSION = 2  # 2: entries keyed by evaluator weight profile
+
+
+class AnalysisCache:
+    """Search results persisted in sqlite, shared across runs and processes.
+
+    Entries are keyed by evaluator weight profile, board size, position key and
+    side (maximizing), so results from other heuristic weights are never reused.
+    Each keeps the deepest result seen: depth, bound flag, score and best move. Writes are
+    buffered and flushed in batches; WAL mode lets several processes read while
+    one writes.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, min_depth=4, batch_size=512):
+        self.path = path
+        self.min_depth = min_depth  # shallower results are cheaper to re-search than to store
+        self.batch_size = batch_size
+        self.pending = {}
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            # older files have no profile column and cannot be trusted; start them over
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                self.conn.execute("DROP TABLE IF EXISTS analysis")
+                self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS analysis ("
+                " profile TEXT, rows INTEGER, cols INTEGER, key INTEGER, maximizing INTEGER,"
+                " depth INTEGER, flag INTEGER, score REAL, move INTEGER,"
+                " PRIMARY KEY (profile, rows, cols, key, maximizing))"
+            )
+
+    @staticmethod
+    def profile_key(weights):
+        return ",".join(str(w) for w in weights)
+
+    @staticmethod
+    def usable(board):
+        # keys must fit sqlite's signed 64-bit INTEGER
+        return (board.rows + 1) * board.cols <= 63
+
+    def probe(self, board, maximizing, weights):
+        """Return (depth, flag, score, move) for this position and weight profile, or None."""
+        if not self.usable(board):
+            return None
+        k = (self.profile_key(weights), board.rows, board.cols, board.key(), int(maximizing))
+        if k in self.pending:
+            return self.pending[k]
+        row = self.conn.execute(
+            "SELECT depth, flag, score, move FROM analysis"
+            " WHERE profile=? AND rows=? AND cols=? AND key=? AND maximizing=?", k).fetchone()
+        if row is None:
+            return None
+        depth, flag, score, move = row
+        # sqlite hands back REAL; heuristic scores are integers apart from +/-inf
+        if abs(score) != float("inf"):
+            score = int(score)
+        return depth, flag, score, move
+
+    def store(self, weights, rows, cols, key, maximizing, depth, flag, score, move):
+        if depth < self.min_depth or (rows + 1) * cols > 63:
+            return
+        k = (self.profile_key(weights), rows, cols, key, int(maximizing))
+        old = self.pending.get(k)
+        if old is None or depth >= old[0]:
+            self.pending[k] = (depth, flag, score, move)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        rows = [k + v for k, v in self.pending.items()]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO analysis (profile, rows, cols, key, maximizing, depth, flag, score, move)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (profile, rows, cols, key, maximizing) DO UPDATE SET"
+                " depth=excluded.depth, flag=excluded.flag, score=excluded.score, move=excluded.move"
+                " WHERE excluded.depth >= analysis.depth", rows)
+        self.pending.clear()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
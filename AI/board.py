@@ -2,7 +2,54 @@ EMPTY = 0
 HUMAN = 1
 AI = 2
 
+_line_geometry = {}
+
+
+def line_geometry(rows, cols):
+    """Every row, column and diagonal with at least 4 cells, cached per board size.
+
+    Returns (lines, cell_lines): lines is a list of (kind, start, cells) and
+    cell_lines[r][c] lists (line number, 3**position) for the lines through a cell,
+    so a line's contents can be kept as one base-3 integer.
+    """
+    key = (rows, cols)
+    if key in _line_geometry:
+        return _line_geometry[key]
+
+    lines = []
+    for r in range(rows):
+        lines.append(("row", r, [(r, c) for c in range(cols)]))
+    for c in range(cols):
+        lines.append(("col", c, [(r, c) for r in range(rows)]))
+    # down-right diagonals start on the top row or left column
+    for r0, c0 in [(r, 0) for r in range(rows)] + [(0, c) for c in range(1, cols)]:
+        cells = [(r0 + i, c0 + i) for i in range(min(rows - r0, cols - c0))]
+        if len(cells) >= 4:
+            lines.append(("diag", (r0, c0), cells))
+    # up-right diagonals start on the bottom row or left column
+    for r0, c0 in [(r, 0) for r in range(rows)] + [(rows - 1, c) for c in range(1, cols)]:
+        cells = [(r0 - i, c0 + i) for i in range(min(r0 + 1, cols - c0))]
+        if len(cells) >= 4:
+            lines.append(("anti", (r0, c0), cells))
+
+    cell_lines = [[[] for _ in range(cols)] for _ in range(rows)]
+    for li, (_, _, cells) in enumerate(lines):
+        for i, (r, c) in enumerate(cells):
+            cell_lines[r][c].append((li, 3 ** i))
+    cell_lines = [[tuple(x) for x in row] for row in cell_lines]
+
+    _line_geometry[key] = (lines, cell_lines)
+    return lines, cell_lines
+
+
 class Board:
+    # heights[c] = pieces in column c; moves = stack of columns played on this board.
+    # mask / ai_bits mirror the grid as bitboards with rows+1 bits per column.
+    # line_codes[i] is line i of line_geometry() read as a base-3 number of cell values;
+    # it is None until track_lines() is called, so boards that are never evaluated skip it.
+    __slots__ = ("rows", "cols", "grid", "heights", "moves", "ply", "legal", "mask", "ai_bits",
+                 "line_codes", "cell_lines")
+
     def __init__(self, rows=6, cols=7, grid=None):
         self.rows = rows
         self.cols = cols
@@ -11,35 +58,140 @@ class Board:
         else:
             self.grid = [[EMPTY for _ in range(cols)] for _ in range(rows)]
 
+        self.heights = [0] * cols
+        self.moves = []
+        self.mask = 0
+        self.ai_bits = 0
+        for c in range(cols):
+            for r in range(rows - 1, -1, -1):
+                v = self.grid[r][c]
+                if v == EMPTY:
+                    break
+                bit = 1 << (c * (rows + 1) + self.heights[c])
+                self.mask |= bit
+                if v == AI:
+                    self.ai_bits |= bit
+                self.heights[c] += 1
+        self.ply = sum(self.heights)
+        self.legal = tuple(c for c in range(cols) if self.heights[c] < rows)
+
+        self.line_codes = None
+        self.cell_lines = None
+
+    @classmethod
+    def from_moves(cls, moves, rows=6, cols=7, first=HUMAN):
+        """Build a board from an iterable of columns (or a digit string), players alternating."""
+        board = cls(rows, cols)
+        second = AI if first == HUMAN else HUMAN
+        for i, col in enumerate(moves):
+            col = int(col)
+            if col < 0 or col >= cols or board.heights[col] == rows:
+                raise ValueError(f"illegal move {col}")
+            board.play(col, first if i % 2 == 0 else second)
+        return board
+
     def clone(self):
-        return Board(self.rows, self.cols, [row[:] for row in self.grid])
+        b = Board.__new__(Board)
+        b.rows = self.rows
+        b.cols = self.cols
+        b.grid = [row[:] for row in self.grid]
+        b.heights = self.heights[:]
+        b.moves = self.moves[:]
+        b.ply = self.ply
+        b.legal = self.legal
+        b.mask = self.mask
+        b.ai_bits = self.ai_bits
+        b.line_codes = self.line_codes[:] if self.line_codes is not None else None
+        b.cell_lines = self.cell_lines
+        return b
 
     def as_tuple(self):
         return tuple(tuple(row) for row in self.grid)
 
+    def key(self):
+        """Unique integer for this position (AI stones plus a marker above each column)."""
+        return self.ai_bits + self.mask
+
+    def track_lines(self):
+        """Start keeping line_codes up to date on every move; returns them."""
+        lines, self.cell_lines = line_geometry(self.rows, self.cols)
+        self.line_codes = [sum(self.grid[r][c] * 3 ** i for i, (r, c) in enumerate(cells))
+                           for _, _, cells in lines]
+        return self.line_codes
+
     def valid_moves(self):
-        return [c for c in range(self.cols) if self.grid[0][c] == EMPTY]
+        return self.legal
 
     def is_full(self):
-        return all(self.grid[0][c] != EMPTY for c in range(self.cols))
+        return not self.legal
+
+    # ---------- make / unmake ----------
+    def play(self, col, player=None):
+        """Drop a piece in a column known to be legal; returns the row. O(1).
+
+        Without a player, Human moves on even plies and AI on odd ones.
+        """
+        if player is None:
+            player = HUMAN if self.ply % 2 == 0 else AI
+        h = self.heights[col]
+        r = self.rows - 1 - h
+        self.grid[r][col] = player
+        codes = self.line_codes
+        if codes is not None:
+            for li, pw in self.cell_lines[r][col]:
+                codes[li] += player * pw
+        bit = 1 << (col * (self.rows + 1) + h)
+        self.mask |= bit
+        if player == AI:
+            self.ai_bits |= bit
+        self.heights[col] = h + 1
+        self.moves.append(col)
+        self.ply += 1
+        if h + 1 == self.rows:
+            self.legal = tuple(c for c in self.legal if c != col)
+        return r
+
+    def undo(self):
+        """Take back the last move played on this board; returns its column."""
+        col = self.moves.pop()
+        self._remove_top(col)
+        return col
+
+    def _remove_top(self, col):
+        h = self.heights[col] - 1
+        r = self.rows - 1 - h
+        player = self.grid[r][col]
+        self.grid[r][col] = EMPTY
+        codes = self.line_codes
+        if codes is not None:
+            for li, pw in self.cell_lines[r][col]:
+                codes[li] -= player * pw
+        bit = 1 << (col * (self.rows + 1) + h)
+        self.mask &= ~bit
+        self.ai_bits &= ~bit
+        self.heights[col] = h
+        self.ply -= 1
+        if h + 1 == self.rows:
+            self.legal = tuple(c for c in range(self.cols) if self.heights[c] < self.rows)
 
     def drop_piece(self, col, player):
         if col < 0 or col >= self.cols:
             return None
-        if self.grid[0][col] != EMPTY:
+        if self.heights[col] == self.rows:
             return None
-        for r in range(self.rows - 1, -1, -1):
-            if self.grid[r][col] == EMPTY:
-                self.grid[r][col] = player
-                return r
-        return None
+        return self.play(col, player)
 
     def undo_top(self, col):
-        for r in range(self.rows):
-            if self.grid[r][col] != EMPTY:
-                self.grid[r][col] = EMPTY
-                return True
-        return False
+        if self.heights[col] == 0:
+            return False
+        if self.moves and self.moves[-1] == col:
+            self.moves.pop()
+        elif col in self.moves:
+            # out-of-order undo: drop the latest entry for this column
+            i = len(self.moves) - 1 - self.moves[::-1].index(col)
+            del self.moves[i]
+        self._remove_top(col)
+        return True
 
     def check_winner(self):
         g = self.grid
@@ -75,13 +227,39 @@ class Board:
 
         return None
 
+    def last_move_winner(self):
+        """Winner by the last move on the move stack; falls back to a full scan without one."""
+        if not self.moves:
+            return self.check_winner()
+        col = self.moves[-1]
+        r = self.rows - self.heights[col]
+        player = self.grid[r][col]
+        return player if self._connects(r, col, player) else None
+
     def is_winning_move(self, col, player):
-        row = self.drop_piece(col, player)
-        if row is None:
+        """Would dropping in col connect four for player? Checks only lines through the landing cell."""
+        if col < 0 or col >= self.cols or self.heights[col] == self.rows:
             return False
-        winner = self.check_winner()
-        self.undo_top(col)
-        return winner == player
+        return self._connects(self.rows - 1 - self.heights[col], col, player)
+
+    def _connects(self, r, col, player):
+        g = self.grid
+        R, C = self.rows, self.cols
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            rr, cc = r + dr, col + dc
+            while 0 <= rr < R and 0 <= cc < C and g[rr][cc] == player:
+                count += 1
+                rr += dr
+                cc += dc
+            rr, cc = r - dr, col - dc
+            while 0 <= rr < R and 0 <= cc < C and g[rr][cc] == player:
+                count += 1
+                rr -= dr
+                cc -= dc
+            if count >= 4:
+                return True
+        return False
 
     def print(self):
         print("\nBoard:")
@@ -0,0 +1,212 @@
+"""Long-lived Connect 4 engine speaking a UCI-style protocol on stdin/stdout.
+
+One process keeps a single Minimax (and its transposition table) alive across
+commands, so batch tools pay the import and cold-cache cost only once.
+
+Commands:
+    uci | isready | newgame | quit
+    position [startpos] [moves] <moves>     moves are 0-based columns, e.g. "3324"
+    go [depth N] [movetime MS] [infinite]
+    ponder                                  search until "stop"
+    stop
+    setoption name <Hash|Rows|Cols|Depth|MultiPV> value <N>
+    d                                       print the current board
+
+Positions are scored for the side to move; Human (X) always moves first.
+"""
+import math
+import sys
+import threading
+import time
+from board import Board
+from minimax import Minimax
+from position import board_from_moves, side_to_move, oriented
+from TreeRecorder import NullRecorder
+
+TT_ENTRY_BYTES = 256  # rough size of one transposition entry, for the Hash option
+DEFAULT_DEPTH = 6
+
+
+def format_score(value):
+    if value is None:
+        return "none"
+    if value == math.inf:
+        return "win"
+    if value == -math.inf:
+        return "loss"
+    return str(int(value))
+
+
+class Engine:
+    def __init__(self, out=sys.stdout):
+        self.out = out
+        self.out_lock = threading.Lock()
+        self.minimax = Minimax(NullRecorder())
+        self.minimax.on_iteration = self.report_iteration
+        self.minimax.on_multipv = self.report_multipv
+        self.rows, self.cols = 6, 7
+        self.default_depth = DEFAULT_DEPTH
+        self.multipv = 1  # 0 = score every root move
+        self.board = Board(self.rows, self.cols)
+        self.search_thread = None
+        self.search_started = 0
+
+    def send(self, line):
+        with self.out_lock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    # ---------- commands ----------
+    def handle(self, line):
+        """Run one command; returns False once the engine should exit."""
+        tokens = line.split()
+        if not tokens:
+            return True
+        cmd, args = tokens[0], tokens[1:]
+
+        if cmd == "quit":
+            self.stop()
+            return False
+        if cmd == "uci":
+            self.send("id name Connect4 Minimax")
+            self.send("option name Hash type spin default 0")
+            self.send(f"option name Rows type spin default {self.rows}")
+            self.send(f"option name Cols type spin default {self.cols}")
+            self.send(f"option name Depth type spin default {self.default_depth}")
+            self.send(f"option name MultiPV type spin default {self.multipv}")
+            self.send("uciok")
+        elif cmd == "isready":
+            self.send("readyok")
+        elif cmd in ("newgame", "ucinewgame"):
+            self.stop()
+            self.minimax.transposition.clear()
+            self.board = Board(self.rows, self.cols)
+        elif cmd == "position":
+            self.stop()
+            self.set_position(args)
+        elif cmd == "go":
+            self.go(args)
+        elif cmd == "ponder":
+            self.go(["infinite"])
+        elif cmd == "stop":
+            self.stop()
+        elif cmd == "setoption":
+            self.stop()
+            self.set_option(args)
+        elif cmd == "d":
+            with self.out_lock:
+                self.board.print()
+        else:
+            self.send(f"info string unknown command: {cmd}")
+        return True
+
+    def set_position(self, args):
+        moves = "".join(a for a in args if a not in ("startpos", "moves"))
+        try:
+            self.board = board_from_moves(moves, self.rows, self.cols)
+        except ValueError as e:
+            self.send(f"info string {e}")
+
+    def set_option(self, args):
+        # setoption name <name> value <value>
+        if "name" not in args or "value" not in args:
+            self.send("info string usage: setoption name <name> value <value>")
+            return
+        name = " ".join(args[args.index("name") + 1:args.index("value")]).lower()
+        try:
+            value = int(args[args.index("value") + 1])
+        except (IndexError, ValueError):
+            self.send("info string option value must be an integer")
+            return
+
+        if name == "hash":
+            # value in MB, 0 = unbounded
+            self.minimax.max_tt_entries = value * 1024 * 1024 // TT_ENTRY_BYTES if value > 0 else None
+            self.minimax.transposition.clear()
+        elif name in ("rows", "cols"):
+            if name == "rows":
+                self.rows = value
+            else:
+                self.cols = value
+            self.minimax.transposition.clear()
+            self.board = Board(self.rows, self.cols)
+        elif name == "depth":
+            self.default_depth = value
+        elif name == "multipv":
+            self.multipv = value
+        else:
+            self.send(f"info string unknown option: {name}")
+
+    def go(self, args):
+        self.stop()
+        depth = self.default_depth
+        time_limit = None
+        i = 0
+        try:
+            while i < len(args):
+                if args[i] == "depth" and i + 1 < len(args):
+                    depth = int(args[i + 1])
+                    i += 1
+                elif args[i] == "movetime" and i + 1 < len(args):
+                    time_limit = int(args[i + 1]) / 1000.0
+                    depth = self.rows * self.cols
+                    i += 1
+                elif args[i] in ("infinite", "ponder"):
+                    depth = self.rows * self.cols
+                i += 1
+        except ValueError:
+            self.send("info string depth and movetime must be integers")
+            return
+
+        search_board = oriented(self.board, side_to_move(self.board))
+        self.minimax.stop_requested = False
+        self.search_thread = threading.Thread(target=self.search, args=(search_board, depth, time_limit),
+                                              daemon=True)
+        self.search_thread.start()
+
+    def stop(self):
+        if self.search_thread is not None:
+            self.minimax.stop_requested = True
+            self.search_thread.join()
+            self.search_thread = None
+
+    # ---------- search ----------
+    def search(self, board, depth, time_limit):
+        if board.check_winner() is not None or board.is_full():
+            self.send("bestmove none")
+            return
+
+        self.search_started = time.time()
+        depth = min(depth, board.rows * board.cols - board.ply)
+        if self.multipv == 1:
+            _, move = self.minimax.find_best_move(board, depth, True, time_limit)
+        else:
+            lines = self.minimax.find_best_moves_multipv(board, depth, self.multipv or None, time_limit)
+            move = lines[0][1] if lines else None
+        if move is None:
+            # stopped before depth 1 finished
+            move = board.valid_moves()[0]
+        self.send(f"bestmove {move}")
+
+    def report_iteration(self, depth, value, move):
+        ms = int((time.time() - self.search_started) * 1000)
+        self.send(f"info depth {depth} score {format_score(value)} nodes {self.minimax.nodes} "
+                  f"time {ms} pv {move}")
+
+    def report_multipv(self, depth, lines):
+        ms = int((time.time() - self.search_started) * 1000)
+        for i, (value, _, pv) in enumerate(lines, 1):
+            self.send(f"info depth {depth} multipv {i} score {format_score(value)} "
+                      f"nodes {self.minimax.nodes} time {ms} pv {' '.join(map(str, pv))}")
+
+
+def main():
+    engine = Engine()
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
+    engine.stop()
+
+
+if __name__ == "__main__":
+    main()
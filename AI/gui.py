@@ -2,6 +2,11 @@ import tkinter as tk
 from tkinter import messagebox, scrolledtext
 from board import Board, HUMAN, AI
 from minimax import Minimax
+from analysis_cache import AnalysisCache
+from mcts import MCTS
+from concurrent.futures import ProcessPoolExecutor
+from TreeRecorder import NullRecorder
+from replay import replay_tree
 
 class SimpleConnect4:
     def __init__(self, master):
@@ -11,8 +16,13 @@ class SimpleConnect4:
         
         # Initialize Game Logic
         self.board = Board(rows=6, cols=7)
-        self.minimax = Minimax()
+        # Trees are not recorded during the search; they are replayed in the background
+        self.minimax = Minimax(NullRecorder(), cache=AnalysisCache())
+        self.minimax.record_fingerprints = True
+        self.tree_pool = None
+        self.mcts = None
         self.use_pruning = True
+        self.mcts_time = 1.0  # seconds per AI move with MCTS
         self.ai_move_count = 0 # Track AI moves
         
         # Main layout container
@@ -32,6 +42,9 @@ class SimpleConnect4:
         self.btn2 = tk.Button(self.selection_frame, text="Without Pruning", command=lambda: self.setup_board(False))
         self.btn2.pack(pady=5)
 
+        self.btn3 = tk.Button(self.selection_frame, text="Monte Carlo Tree Search", command=lambda: self.setup_board(True, use_mcts=True))
+        self.btn3.pack(pady=5)
+
         # Game Area (Board + Log)
         self.game_frame = tk.Frame(self.main_frame)
         
@@ -46,9 +59,12 @@ class SimpleConnect4:
         self.log_text.pack(fill=tk.BOTH, expand=True)
         self.log_text.configure(state='disabled')
 
-    def setup_board(self, pruning):
+    def setup_board(self, pruning, use_mcts=False):
         """Removes buttons and shows the game board."""
         self.use_pruning = pruning
+        if use_mcts:
+            self.mcts = MCTS(workers=None)
+            self.log_label.configure(text="MCTS Root Statistics")
         
         # Clear the selection screen
         self.selection_frame.pack_forget()
@@ -89,7 +105,9 @@ class SimpleConnect4:
             # 2. AI TURN
             # Select algorithm based on previous choice
             depth = 4
-            if self.use_pruning:
+            if self.mcts:
+                _, move = self.mcts.find_best_move(self.board, self.mcts_time)
+            elif self.use_pruning:
                 _, move = self.minimax.find_best_move_with_ab(self.board, depth)
             else:
                 _, move = self.minimax.find_best_move_without_pruning(self.board, depth)
@@ -103,13 +121,33 @@ class SimpleConnect4:
 
     def show_tree_log(self):
         """Displays the Minimax search tree in the side panel."""
+        if self.mcts:
+            self.fill_tree_log(self.mcts.recorder.lines)
+            return
+
+        # Rebuild the tree from the search fingerprint without blocking the game
+        if self.tree_pool is None:
+            self.tree_pool = ProcessPoolExecutor(max_workers=1)
+        self.fill_tree_log([(0, "Rebuilding tree...")])
+        future = self.tree_pool.submit(replay_tree, self.minimax.last_fingerprint)
+        self.master.after(50, self.poll_tree_log, future, self.ai_move_count)
+
+    def poll_tree_log(self, future, move_number):
+        if move_number != self.ai_move_count:
+            return  # a newer move replaced this tree
+        if not future.done():
+            self.master.after(50, self.poll_tree_log, future, move_number)
+            return
+        self.fill_tree_log(future.result())
+
+    def fill_tree_log(self, lines):
         self.log_text.configure(state='normal')
         self.log_text.delete(1.0, tk.END) # Clear previous log
 
         header = f"========================================\nAI Move #{self.ai_move_count}\n========================================\n"
         self.log_text.insert(tk.END, header)
 
-        for level, line in self.minimax.recorder.lines:
+        for level, line in lines:
             indent = "  " * level
             self.log_text.insert(tk.END, f"{indent}{line}\n")
         
@@ -121,14 +159,21 @@ class SimpleConnect4:
         if winner == player:
             text = "You Win!" if player == HUMAN else "AI Wins!"
             messagebox.showinfo("Game Over", text)
-            self.master.destroy() # Close window
+            self.close()
             return True
         elif self.board.is_full():
             messagebox.showinfo("Game Over", "Draw!")
-            self.master.destroy()
+            self.close()
             return True
         return False
 
+    def close(self):
+        if self.mcts:
+            self.mcts.close()
+        if self.tree_pool:
+            self.tree_pool.shutdown(wait=False, cancel_futures=True)
+        self.master.destroy() # Close window
+
 if __name__ == "__main__":
     root = tk.Tk()
     game = SimpleConnect4(root)
@@ -1,4 +1,4 @@
-from board import EMPTY, HUMAN, AI
+from board import EMPTY, HUMAN, AI, line_geometry
 
 class heuristic:
     def __init__(self):
@@ -67,4 +67,113 @@ class heuristic:
                 window = [g[r-i][c+i] for i in range(4)]
                 score += self.evaluate_window(window, player)
 
-        return score
\ No newline at end of file
+        return score
+
+
+MAX_TABLE_LENGTH = 8  # longest line tabulated whole (3**8 entries); longer lines are split
+
+
+def stone_counts(length, player):
+    """Number of `player` stones in every line code of `length` cells."""
+    counts = [0]
+    for n in range(1, length + 1):
+        counts = [(code % 3 == player) + counts[code // 3] for code in range(3 ** n)]
+    return counts
+
+
+class ChunkedLine:
+    """Score table for a line too long to tabulate: its first chunk plus the rest of the line.
+
+    The head table scores the windows that lie inside the first chunk (and, on the
+    centre column, the centre stones in front of the overlap), so the rest of the
+    line starts at the first window the head did not cover.
+    """
+    __slots__ = ("head", "size", "step", "tail")
+
+    def __init__(self, head, length, tail):
+        self.head = head
+        self.size = 3 ** length
+        self.step = 3 ** (length - 3)
+        self.tail = tail
+
+    def __getitem__(self, code):
+        return self.head[code % self.size] + self.tail[code // self.step]
+
+
+class LookupHeuristic(heuristic):
+    """Same scores as heuristic.evaluate, read from precomputed per-line tables.
+
+    Every row, column and diagonal of the board is kept as a base-3 code
+    (Board.line_codes), and each line's score for every possible content is
+    tabulated once per board size and weight profile, so an evaluation is one
+    table lookup per line. Tables are built from the 81 possible 4-cell windows;
+    lines longer than MAX_TABLE_LENGTH are looked up in overlapping chunks.
+    """
+
+    # kept apart: the keys have different layouts, and True == 1 would let them collide
+    _window_tables = {}
+    _line_tables = {}
+    _board_tables = {}
+
+    def weights(self):
+        return (self.W4, self.W3, self.W2, self.opp_W3, self.center_weight)
+
+    def window_table(self, player):
+        key = (player, self.weights())
+        table = self._window_tables.get(key)
+        if table is None:
+            table = [self.evaluate_window([(code // 3 ** i) % 3 for i in range(4)], player)
+                     for code in range(81)]
+            self._window_tables[key] = table
+        return table
+
+    def line_table(self, length, player, center):
+        """Scores of every content of a line of `length` cells (length <= MAX_TABLE_LENGTH).
+
+        Cell i is digit i of the code, so dropping the first cell is code // 3 and
+        the first window is code % 81: a line scores its first window plus the rest.
+        """
+        key = (length, player, center, self.weights())
+        table = self._line_tables.get(key)
+        if table is None:
+            window = self.window_table(player)
+            table = [0] * 27
+            for n in range(4, length + 1):
+                table = [window[code % 81] + table[code // 3] for code in range(3 ** n)]
+            if center:
+                table = [score + count * self.center_weight
+                         for score, count in zip(table, stone_counts(length, player))]
+            self._line_tables[key] = table
+        return table
+
+    def chunked_table(self, length, player, center):
+        if length <= MAX_TABLE_LENGTH:
+            return self.line_table(length, player, center)
+        head = self.line_table(MAX_TABLE_LENGTH, player, False)
+        if center:
+            # centre stones in front of the overlap; the tail counts the rest
+            counts = stone_counts(MAX_TABLE_LENGTH - 3, player)
+            step = len(counts)
+            head = [score + counts[code % step] * self.center_weight for code, score in enumerate(head)]
+        return ChunkedLine(head, MAX_TABLE_LENGTH, self.chunked_table(length - MAX_TABLE_LENGTH + 3, player, center))
+
+    def board_tables(self, rows, cols, player):
+        key = (rows, cols, player, self.weights())
+        tables = self._board_tables.get(key)
+        if tables is None:
+            lines, _ = line_geometry(rows, cols)
+            center = cols // 2
+            tables = [self.chunked_table(len(cells), player, kind == "col" and start == center)
+                      for kind, start, cells in lines]
+            self._board_tables[key] = tables
+        return tables
+
+    def prepare(self, rows, cols):
+        """Build the tables for a board size now rather than during the first search."""
+        for player in (HUMAN, AI):
+            self.board_tables(rows, cols, player)
+
+    def evaluate(self, board, player):
+        tables = self.board_tables(board.rows, board.cols, player)
+        codes = board.line_codes if board.line_codes is not None else board.track_lines()
+        return sum(t[code] for t, code in zip(tables, codes))
@@ -1,8 +1,30 @@
 import time
 from board import Board, HUMAN, AI
 from minimax import Minimax
+from analysis_cache import AnalysisCache
+from mcts import MCTS
+from concurrent.futures import ProcessPoolExecutor
 from tree import TreeTXT
-from TreeRecorder import TreeRecorder
+from TreeRecorder import TreeRecorder, NullRecorder
+from replay import save_tree as save_tree_file, tree_lines
+
+# Background process that rebuilds deferred trees while the game goes on
+_tree_pool = None
+
+
+def tree_pool():
+    global _tree_pool
+    if _tree_pool is None:
+        _tree_pool = ProcessPoolExecutor(max_workers=1)
+    return _tree_pool
+
+
+def close_tree_pool():
+    """Wait for pending background tree saves."""
+    global _tree_pool
+    if _tree_pool is not None:
+        _tree_pool.shutdown(wait=True)
+        _tree_pool = None
 
 
 def print_board(board):
@@ -32,7 +54,10 @@ def ai_turn(board, minimax, depth, use_ab=True, time_limit=None, save_tree=False
     # Clear previous tree recordings
     minimax.recorder.clear()
 
-    if use_ab:
+    if isinstance(minimax, MCTS):
+        value, move = minimax.find_best_move(board, time_limit)
+        algorithm = "with MCTS"
+    elif use_ab:
         value, move = minimax.find_best_move_with_ab(board, depth, time_limit)
         algorithm = "with Alpha-Beta"
     else:
@@ -41,14 +66,23 @@ def ai_turn(board, minimax, depth, use_ab=True, time_limit=None, save_tree=False
 
     print(f" AI chose column {move} (value: {value}) - {algorithm}")
 
+    # Deferred mode keeps only a fingerprint; the tree is replayed on demand
+    if getattr(minimax, "record_fingerprints", False):
+        tree = minimax.last_fingerprint
+    else:
+        tree = minimax.recorder.lines
+
     # Save tree if requested
-    if save_tree and minimax.recorder.lines:
-        tree_saver = TreeTXT()
+    if save_tree and tree:
         filename = f"ai_move_{int(time.time())}.txt"
-        tree_saver.save(minimax.recorder.lines, filename)
-        print(f" AI decision tree saved to: {filename}")
+        if isinstance(tree, list):
+            save_tree_file(tree, filename)
+            print(f" AI decision tree saved to: {filename}")
+        else:
+            tree_pool().submit(save_tree_file, tree, filename)
+            print(f" AI decision tree will be saved to: {filename}")
 
-    return move, minimax.recorder.lines
+    return move, tree
 
 
 def save_game_tree(tree_lines, filename_prefix):
@@ -68,11 +102,20 @@ def play_game_with_tree_recording():
     AI_DEPTH = 4
     USE_ALPHA_BETA = True
     TIME_LIMIT = 10  # seconds
+    MCTS_TIME_LIMIT = 2  # seconds per move for the MCTS engine
 
     # Create objects with tree recorder
     board = Board(ROWS, COLS)
     recorder = TreeRecorder()
-    minimax = Minimax(recorder)
+
+    engine_choice = input("\nEngine? (1 for Minimax, 2 for MCTS, Enter for Minimax): ")
+    if engine_choice == "2":
+        engine = MCTS(workers=None, recorder=recorder)
+        TIME_LIMIT = MCTS_TIME_LIMIT
+    else:
+        # search at full speed; trees are rebuilt from fingerprints when saved
+        engine = Minimax(NullRecorder(), AnalysisCache())
+        engine.record_fingerprints = True
 
     # Store all game trees
     game_trees = []
@@ -119,15 +162,15 @@ def play_game_with_tree_recording():
             board.drop_piece(col, HUMAN)
             print(f" You played in column {col}")
         else:
-            col, tree_lines = ai_turn(board, minimax, AI_DEPTH, USE_ALPHA_BETA, TIME_LIMIT, save_tree=True)
+            col, tree = ai_turn(board, engine, AI_DEPTH, USE_ALPHA_BETA, TIME_LIMIT, save_tree=True)
             if col is not None:
                 board.drop_piece(col, AI)
-                # Store the tree for this AI move
-                if tree_lines:
+                # Store the tree (or its fingerprint) for this AI move
+                if tree:
                     game_trees.append({
                         'move_number': move_count,
                         'column': col,
-                        'tree_lines': tree_lines.copy()
+                        'tree': tree.copy() if isinstance(tree, list) else tree
                     })
             else:
                 print(" AI timed out, playing random move")
@@ -142,15 +185,20 @@ def play_game_with_tree_recording():
 
     # End of game
     print_board(board)
+    if isinstance(engine, MCTS):
+        engine.close()
 
     # Save all game trees
     if game_trees and input("\nSave all game trees? (y/n): ").lower() == 'y':
         for i, game_tree in enumerate(game_trees):
             filename = f"full_game_move_{game_tree['move_number']}_col_{game_tree['column']}.txt"
             tree_saver = TreeTXT()
-            tree_saver.save(game_tree['tree_lines'], filename)
+            tree_saver.save(tree_lines(game_tree['tree']), filename)
             print(f"Saved tree for move {game_tree['move_number']} to: {filename}")
 
+    # Let pending background saves finish
+    close_tree_pool()
+
 
 
 
@@ -232,6 +280,7 @@ def show_tree_recording_info():
     print("   • TERMINAL nodes - Win/loss/draw states")
     print("   • IMMEDIATE nodes - Winning moves found")
     print("   • TT-HIT nodes - Transposition table cache hits")
+    print("   • CACHE-HIT nodes - Results reused from earlier runs (analysis_cache.db)")
     print("   • PRUNED branches - Alpha-Beta cutoffs")
     print("   • EXIT nodes - Returning from recursive calls")
     print("\n Information captured:")
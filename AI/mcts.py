@@ -0,0 +1,240 @@
+"""Monte Carlo Tree Search (UCT) backend.
+
+Strength scales with time and cores rather than with a fixed depth: each
+worker process grows its own tree from the same root for the time budget
+(root parallelism) and the root visit counts are summed. Trees are kept
+between moves and reused when the new position is a descendant of the old root.
+"""
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from board import AI
+from position import other
+from TreeRecorder import TreeRecorder
+
+EXPLORATION = 1.4
+IPC_MARGIN = 0.05  # seconds kept back from workers for collecting results
+
+
+class Node:
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins", "player")
+
+    def __init__(self, move, parent, player, legal):
+        self.move = move          # column that led here
+        self.parent = parent
+        self.player = player      # who played `move`; wins are counted for them
+        self.children = {}
+        self.untried = list(legal)
+        self.visits = 0
+        self.wins = 0.0
+
+    def select_child(self):
+        log_n = math.log(self.visits)
+        return max(self.children.values(),
+                   key=lambda ch: ch.wins / ch.visits + EXPLORATION * math.sqrt(log_n / ch.visits))
+
+
+def rollout(board, to_move, rng):
+    """Random playout with immediate-win and forced-block checks; returns the winner or None.
+
+    Moves are made in place and taken back with undo, so a playout allocates nothing.
+    """
+    played = 0
+    winner = None
+    while board.legal:
+        legal = board.legal
+        opp = other(to_move)
+        move = None
+        for c in legal:
+            if board.is_winning_move(c, to_move):
+                move = c
+                winner = to_move
+                break
+        if move is None:
+            for c in legal:
+                if board.is_winning_move(c, opp):
+                    move = c
+                    break
+        if move is None:
+            move = legal[rng.randrange(len(legal))]
+        board.play(move, to_move)
+        played += 1
+        if winner is not None:
+            break
+        to_move = opp
+
+    for _ in range(played):
+        board.undo()
+    return winner
+
+
+def fallback_move(board, player):
+    """Move for when no playout finished: block an immediate threat, else the most central column."""
+    opp = other(player)
+    for c in board.valid_moves():
+        if board.is_winning_move(c, opp):
+            return c
+    return min(board.valid_moves(), key=lambda c: abs(c - board.cols // 2))
+
+
+class TreeSearch:
+    """Single-threaded UCT tree with reuse between searches."""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.root = None
+        self.root_board = None
+
+    def reuse_root(self, board, player):
+        # look up to two plies below the old root for the new position
+        if self.root is None or self.root_board.rows != board.rows or self.root_board.cols != board.cols:
+            return None
+        target = board.key()
+        if self.root_board.key() == target and self.root.player == other(player):
+            return self.root
+        scratch = self.root_board.clone()
+        for c1, child in self.root.children.items():
+            scratch.play(c1, child.player)
+            for c2, grandchild in child.children.items():
+                scratch.play(c2, grandchild.player)
+                found = scratch.key() == target
+                scratch.undo()
+                if found and grandchild.player == other(player):
+                    return grandchild
+            found = scratch.key() == target
+            scratch.undo()
+            if found and child.player == other(player):
+                return child
+        return None
+
+    def search(self, board, player, deadline, max_iterations=None):
+        board = board.clone()
+        root = self.reuse_root(board, player)
+        if root is None:
+            root = Node(None, None, other(player), board.legal)
+        root.parent = None
+        self.root, self.root_board = root, board.clone()
+
+        iterations = 0
+        while time.time() < deadline and (max_iterations is None or iterations < max_iterations):
+            node = root
+            depth = 0
+
+            # selection
+            while not node.untried and node.children:
+                node = node.select_child()
+                board.play(node.move, node.player)
+                depth += 1
+
+            # expansion (terminal nodes never get children, so a win here was the last move)
+            winner = board.last_move_winner() if depth else None
+            if winner is None and node.untried:
+                move = node.untried.pop(self.rng.randrange(len(node.untried)))
+                mover = other(node.player)
+                board.play(move, mover)
+                depth += 1
+                child = Node(move, node, mover, board.legal)
+                node.children[move] = child
+                node = child
+                winner = board.last_move_winner()
+                if winner is not None:
+                    child.untried = []
+                else:
+                    # simulation
+                    winner = rollout(board, other(mover), self.rng)
+
+            # backpropagation
+            while node is not None:
+                node.visits += 1
+                if winner == node.player:
+                    node.wins += 1
+                elif winner is None:
+                    node.wins += 0.5
+                node = node.parent
+            for _ in range(depth):
+                board.undo()
+            iterations += 1
+
+        return {c: (ch.visits, ch.wins) for c, ch in root.children.items()}, iterations
+
+
+# per-process tree, kept between moves for reuse
+_worker_tree = None
+
+
+def search_in_worker(board, player, deadline, seed, max_iterations):
+    global _worker_tree
+    if _worker_tree is None:
+        _worker_tree = TreeSearch(seed)
+    return _worker_tree.search(board, player, deadline, max_iterations)
+
+
+class MCTS:
+    def __init__(self, workers=1, recorder=None, seed=None):
+        self.workers = workers if workers else (os.cpu_count() or 1)
+        self.recorder = recorder if recorder else TreeRecorder()
+        self.seed = seed
+        self.tree = TreeSearch(seed)
+        self.pool = None
+        self.iterations = 0
+
+    def find_best_move(self, board, time_limit=1.0, player=AI, max_iterations=None):
+        """Return (win_rate, move) for `player`; never runs past time_limit."""
+        start = time.time()
+        self.recorder.clear()
+        if not board.valid_moves():
+            return None, None
+
+        # an immediate win needs no search; forced blocks are left to the search,
+        # which finds them on the first playouts and gives them a real estimate
+        for c in board.valid_moves():
+            if board.is_winning_move(c, player):
+                self.recorder.node(0, "IMMEDIATE", c, 1.0)
+                return 1.0, c
+
+        # below a couple of IPC margins the workers would get no time at all
+        if self.workers == 1 or time_limit < 2 * IPC_MARGIN:
+            stats, self.iterations = self.tree.search(board, player, start + time_limit, max_iterations)
+        else:
+            stats, self.iterations = self.parallel_search(board, player, start, time_limit, max_iterations)
+            if not stats:
+                # workers sent nothing back in time (e.g. while the pool starts); search here instead
+                stats, self.iterations = self.tree.search(board, player, start + time_limit, max_iterations)
+
+        if not stats:
+            return None, fallback_move(board, player)
+
+        move = max(stats, key=lambda c: stats[c][0])
+        visits, wins = stats[move]
+        total = sum(v for v, _ in stats.values())
+        self.recorder.node(0, "ROOT", None, f"visits={total} iterations={self.iterations}")
+        for c in sorted(stats, key=lambda c: -stats[c][0]):
+            v, w = stats[c]
+            self.recorder.node(1, "MOVE", c, f"{w / v:.3f} visits={v}")
+        return wins / visits, move
+
+    def parallel_search(self, board, player, start, time_limit, max_iterations):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers)
+        deadline = start + max(time_limit - IPC_MARGIN, 0)
+        base = self.seed if self.seed is not None else random.randrange(1 << 30)
+        futures = [self.pool.submit(search_in_worker, board, player, deadline, base + i, max_iterations)
+                   for i in range(self.workers)]
+        done, _ = wait(futures, timeout=max(start + time_limit - time.time(), 0))
+
+        stats = {}
+        iterations = 0
+        for f in done:
+            worker_stats, n = f.result()
+            iterations += n
+            for c, (v, w) in worker_stats.items():
+                old_v, old_w = stats.get(c, (0, 0.0))
+                stats[c] = (old_v + v, old_w + w)
+        return stats, iterations
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
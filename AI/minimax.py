@@ -1,19 +1,69 @@
 import math
 import time
 from board import HUMAN, AI
-from heuristic import heuristic
+from heuristic import LookupHeuristic
+from ordering import MoveOrderer
+from tablebase import WIN, DRAW, LOSS
 from TreeRecorder import TreeRecorder
 
+# Transposition entry bound types
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchFingerprint:
+    """What it takes to replay a find_best_move call and rebuild its tree (see replay.py).
+
+    Holds the root position, search settings, the persistent-cache answers in
+    probe order and, of the transposition table the search started from, only
+    the entries it read or overwrote (plus the table's size, so a bounded table
+    is cleared at the same point on replay).
+    """
+
+    def __init__(self, minimax, board, max_depth, use_ab):
+        self.rows = board.rows
+        self.cols = board.cols
+        self.grid = [row[:] for row in board.grid]
+        self.max_depth = max_depth
+        self.use_ab = use_ab
+        self.weights = minimax.h.weights()
+        self.max_tt_entries = minimax.max_tt_entries
+        self.tt_entries = {}
+        self.tt_size = len(minimax.transposition)
+        self.cache_min_depth = minimax.cache.min_depth if minimax.cache is not None else None
+        self.cache_probes = [] if minimax.cache is not None else None
+        self.completed_depth = 0
+        self.shortcut = None  # (level, label, col, value) when no search ran
+
 
 class Minimax:
-    def __init__(self, recorder=None):
-        self.h = heuristic()
+    def __init__(self, recorder=None, cache=None, tablebase=None, rows=6, cols=7):
+        self.h = LookupHeuristic()
+        self.h.prepare(rows, cols)   # so the first timed search doesn't pay for the tables
+        self.orderer = MoveOrderer(self.h)
         self.transposition = {}
         self.start_time = 0
         self.time_limit = None
         self.recorder = recorder if recorder else TreeRecorder()
+        self.nodes = 0
+        self.stop_requested = False  # set from another thread to abort a search
+        self.max_tt_entries = None   # None = unbounded transposition table
+        self.node_budget = None      # abort once this many nodes were searched
+        self.on_iteration = None     # callback(depth, value, move) after each completed depth
+        self.on_multipv = None       # callback(depth, lines) after each completed multi-PV depth
+        self.cache = cache           # optional AnalysisCache shared across runs
+        self.tablebase = tablebase   # optional Tablebase giving perfect play on small boards
+        self.record_fingerprints = False  # keep last_fingerprint so the tree can be rebuilt later
+        self.last_fingerprint = None
+        self.cache_probes = None
+        self.tt_touched = None       # fingerprint.tt_entries while recording a search
+        self.tt_written = set()      # keys stored by the search being recorded
+        self.tt_absent = 0           # entries a replay leaves out but max_tt_entries still counts
 
     def time_up(self):
+        if self.stop_requested:
+            return True
+        if self.node_budget is not None and self.nodes >= self.node_budget:
+            return True
         return self.time_limit and (time.time() - self.start_time) >= self.time_limit
 
     def get_move_order(self, board):
@@ -21,38 +71,74 @@ class Minimax:
         return sorted(board.valid_moves(), key=lambda c: abs(c - center))
 
     def order_moves(self, board, moves, player):
-        scored = []
-        for c in moves:
-            r = board.drop_piece(c, player)
-            if r is None:
-                val = -math.inf
-            else:
-                val = self.h.evaluate(board, AI)
-                board.undo_top(c)
-            scored.append((c, val))
-        scored.sort(key=lambda x: x[1], reverse=True)
-        return [c for c, _ in scored]
+        return self.orderer.order(board, moves, player)[0]
 
     def tt_lookup(self, board, depth, maximizing):
-        return self.transposition.get((board.as_tuple(), depth, maximizing))
-
-    def tt_store(self, board, depth, maximizing, value, move):
-        self.transposition[(board.as_tuple(), depth, maximizing)] = (value, move)
+        key = (board.key(), depth, maximizing)
+        entry = self.transposition.get(key)
+        if self.tt_touched is not None and entry is not None and key not in self.tt_written:
+            self.tt_touched.setdefault(key, entry)
+        return entry
+
+    def tt_store(self, board, depth, maximizing, value, move, flag=EXACT):
+        if self.max_tt_entries is not None and len(self.transposition) + self.tt_absent >= self.max_tt_entries:
+            self.transposition.clear()
+            self.tt_absent = 0
+        key = (board.key(), depth, maximizing)
+        if self.tt_touched is not None and key not in self.tt_written:
+            # an entry from before the search is overwritten; the replay must hold it too
+            if key in self.transposition:
+                self.tt_touched.setdefault(key, self.transposition[key])
+            self.tt_written.add(key)
+        self.transposition[key] = (value, move, flag)
+        if self.cache is not None and depth >= self.cache.min_depth:
+            self.cache.store(self.h.weights(), board.rows, board.cols, board.key(), maximizing,
+                             depth, flag, value, move)
+
+    def cache_lookup(self, board, depth, maximizing):
+        """Persistent-cache entry at least as deep as `depth`, as (value, move, flag)."""
+        if self.cache is None or depth < self.cache.min_depth:
+            return None
+        entry = self.cache.probe(board, maximizing, self.h.weights())
+        if self.cache_probes is not None:
+            self.cache_probes.append(entry)
+        if entry is None or entry[0] < depth:
+            return None
+        _, flag, value, move = entry
+        return value, move, flag
+
+    @staticmethod
+    def bound_flag(value, alpha, beta):
+        if value <= alpha:
+            return UPPER
+        if value >= beta:
+            return LOWER
+        return EXACT
 
     # ✅ Minimax with Alpha-Beta Pruning
     def minimax_with_ab(self, board, depth, maximizing, alpha, beta, level=0, move_col=None):
         if self.time_up():
             return None, None, False
+        self.nodes += 1
 
         # Transposition lookup
         tt = self.tt_lookup(board, depth, maximizing)
         if tt:
-            value, mv = tt
-            self.recorder.node(level, "TT-HIT", move_col, value, alpha, beta)
-            return value, mv, True
+            value, mv, flag = tt
+            if flag == EXACT or (flag == LOWER and value >= beta) or (flag == UPPER and value <= alpha):
+                self.recorder.node(level, "TT-HIT", move_col, value, alpha, beta)
+                return value, mv, True
+
+        # Persistent cache lookup (deep nodes only)
+        cached = self.cache_lookup(board, depth, maximizing)
+        if cached:
+            value, mv, flag = cached
+            if flag == EXACT or (flag == LOWER and value >= beta) or (flag == UPPER and value <= alpha):
+                self.recorder.node(level, "CACHE-HIT", move_col, value, alpha, beta)
+                return value, mv, True
 
         # Terminal states
-        winner = board.check_winner()
+        winner = board.last_move_winner()
         if winner == AI:
             self.recorder.node(level, "TERMINAL", move_col, math.inf, alpha, beta)
             return math.inf, None, True
@@ -64,24 +150,18 @@ class Minimax:
             self.recorder.node(level, "LEAF", move_col, val, alpha, beta)
             return val, None, True
 
-        # Moves
-        valid = board.valid_moves()
+        # Move ordering (also spots an immediate win)
         player = AI if maximizing else HUMAN
-
-        # Immediate win check
-        for c in valid:
-            if board.is_winning_move(c, player):
-                v = math.inf if player == AI else -math.inf
-                self.recorder.node(level, "IMMEDIATE", c, v, alpha, beta)
-                return v, c, True
-
-        # Move ordering
-        moves = self.get_move_order(board)
-        moves = self.order_moves(board, moves, player)
+        moves, win = self.orderer.order(board, self.get_move_order(board), player)
+        if win is not None:
+            v = math.inf if player == AI else -math.inf
+            self.recorder.node(level, "IMMEDIATE", win, v, alpha, beta)
+            return v, win, True
         best_move = moves[0] if moves else None
 
         # Enter node
         self.recorder.node(level, "ENTER", move_col, "MAX" if maximizing else "MIN", alpha, beta)
+        alpha_orig, beta_orig = alpha, beta
 
         # MAX player
         if maximizing:
@@ -109,7 +189,8 @@ class Minimax:
                     self.recorder.prune(level + 1, alpha, beta)
                     break
 
-            self.tt_store(board, depth, maximizing, value, best_move)
+            self.tt_store(board, depth, maximizing, value, best_move,
+                          self.bound_flag(value, alpha_orig, beta_orig))
             self.recorder.node(level, "EXIT", move_col, value, alpha, beta)
             return value, best_move, True
 
@@ -139,7 +220,8 @@ class Minimax:
                     self.recorder.prune(level + 1, alpha, beta)
                     break
 
-            self.tt_store(board, depth, maximizing, value, best_move)
+            self.tt_store(board, depth, maximizing, value, best_move,
+                          self.bound_flag(value, alpha_orig, beta_orig))
             self.recorder.node(level, "EXIT", move_col, value, alpha, beta)
             return value, best_move, True
 
@@ -147,16 +229,17 @@ class Minimax:
     def minimax_without_pruning(self, board, depth, maximizing, level=0, move_col=None):
         if self.time_up():
             return None, None, False
+        self.nodes += 1
 
         # Transposition lookup
         tt = self.tt_lookup(board, depth, maximizing)
-        if tt:
-            value, mv = tt
+        if tt and tt[2] == EXACT:
+            value, mv, _ = tt
             self.recorder.node(level, "TT-HIT", move_col, value, "N/A", "N/A")
             return value, mv, True
 
         # Terminal states
-        winner = board.check_winner()
+        winner = board.last_move_winner()
         if winner == AI:
             self.recorder.node(level, "TERMINAL", move_col, math.inf, "N/A", "N/A")
             return math.inf, None, True
@@ -168,20 +251,13 @@ class Minimax:
             self.recorder.node(level, "LEAF", move_col, val, "N/A", "N/A")
             return val, None, True
 
-        # Moves
-        valid = board.valid_moves()
+        # Move ordering (also spots an immediate win)
         player = AI if maximizing else HUMAN
-
-        # Immediate win check
-        for c in valid:
-            if board.is_winning_move(c, player):
-                v = math.inf if player == AI else -math.inf
-                self.recorder.node(level, "IMMEDIATE", c, v, "N/A", "N/A")
-                return v, c, True
-
-        # Move ordering
-        moves = self.get_move_order(board)
-        moves = self.order_moves(board, moves, player)
+        moves, win = self.orderer.order(board, self.get_move_order(board), player)
+        if win is not None:
+            v = math.inf if player == AI else -math.inf
+            self.recorder.node(level, "IMMEDIATE", win, v, "N/A", "N/A")
+            return v, win, True
         best_move = moves[0] if moves else None
 
         # Enter node
@@ -241,12 +317,39 @@ class Minimax:
 
     # Iterative Deepening for both algorithms
     def find_best_move(self, board, max_depth, use_ab=True, time_limit=None):
+        self.h.prepare(board.rows, board.cols)
         self.start_time = time.time()
         self.time_limit = time_limit
+        self.nodes = 0
         self.recorder.clear()
         best_move = None
         best_value = None
 
+        fingerprint = None
+        if self.record_fingerprints:
+            fingerprint = SearchFingerprint(self, board, max_depth, use_ab)
+            self.last_fingerprint = fingerprint
+            self.cache_probes = fingerprint.cache_probes
+            self.tt_touched = fingerprint.tt_entries
+            self.tt_written = set()
+
+        # Shortcuts are for the pruned search only; the unpruned one is run in full to be measured
+        if use_ab:
+            # Solved small boards need no search at all
+            if self.tablebase is not None and self.tablebase.covers(board):
+                solved = self.tablebase.best_move(board, AI)
+                if solved:
+                    result, distance, mv = solved
+                    value = {WIN: math.inf, LOSS: -math.inf, DRAW: 0}[result]
+                    self.shortcut(fingerprint, "TABLEBASE", mv, f"{value} distance={distance}")
+                    return value, mv
+
+            # A deep enough exact result from an earlier run answers the search outright
+            cached = self.cache_lookup(board, max_depth, True)
+            if cached and cached[2] == EXACT and cached[1] is not None:
+                self.shortcut(fingerprint, "CACHE-HIT", None, cached[0])
+                return cached[0], cached[1]
+
         for depth in range(1, max_depth + 1):
             if self.time_up():
                 break
@@ -261,50 +364,121 @@ class Minimax:
                 break
             best_value = val
             best_move = mv
-
+            if fingerprint:
+                fingerprint.completed_depth = depth
+            if self.on_iteration:
+                self.on_iteration(depth, val, mv)
+
+        self.cache_probes = None
+        self.tt_touched = None
+        self.tt_written = set()
+        if self.cache is not None:
+            self.cache.flush()
         return best_value, best_move
 
+    def shortcut(self, fingerprint, label, col, value):
+        """Record a root answer that needed no search."""
+        self.recorder.node(0, label, col, value)
+        self.cache_probes = None
+        self.tt_touched = None
+        if fingerprint:
+            fingerprint.shortcut = (0, label, col, value)
+
     # ✅ Separate methods for each algorithm
     def find_best_move_with_ab(self, board, max_depth, time_limit=None):
         """Find best move using Minimax WITH Alpha-Beta pruning"""
+        return self.find_best_move(board, max_depth, True, time_limit)
+
+    def find_best_move_without_pruning(self, board, max_depth, time_limit=None):
+        """Find best move using Minimax WITHOUT pruning"""
+        return self.find_best_move(board, max_depth, False, time_limit)
+
+    # Multi-PV: exact scores and principal variations for several root moves
+    def find_best_moves_multipv(self, board, max_depth, k=None, time_limit=None):
+        """Score the top k root moves (all of them when k is None) in one iterative-deepening run.
+
+        Returns a list of (value, move, pv) sorted best first, from the last completed depth.
+        """
+        self.h.prepare(board.rows, board.cols)
         self.start_time = time.time()
         self.time_limit = time_limit
+        self.nodes = 0
         self.recorder.clear()
-        best_move = None
-        best_value = None
+        lines = []
 
         for depth in range(1, max_depth + 1):
             if self.time_up():
                 break
             self.recorder.clear()
 
-            val, mv, ok = self.minimax_with_ab(board, depth, True, -math.inf, math.inf)
+            # search last iteration's best moves first so the k-th score rises quickly
+            moves = [mv for _, mv, _ in lines] if lines else []
+            for c in self.order_moves(board, self.get_move_order(board), AI):
+                if c not in moves:
+                    moves.append(c)
 
-            if not ok:
+            scored = self.multipv_root(board, depth, moves, k)
+            if scored is None:
                 break
-            best_value = val
-            best_move = mv
-
-        return best_value, best_move
+            lines = scored
+            if self.on_multipv:
+                self.on_multipv(depth, lines)
 
-    def find_best_move_without_pruning(self, board, max_depth, time_limit=None):
-        """Find best move using Minimax WITHOUT pruning"""
-        self.start_time = time.time()
-        self.time_limit = time_limit
-        self.recorder.clear()
-        best_move = None
-        best_value = None
+        if self.cache is not None:
+            self.cache.flush()
+        return lines
 
-        for depth in range(1, max_depth + 1):
+    def multipv_root(self, board, depth, moves, k):
+        scored = []
+        for c in moves:
             if self.time_up():
-                break
-            self.recorder.clear()
+                return None
 
-            val, mv, ok = self.minimax_without_pruning(board, depth, True)
+            # moves that cannot beat the current k-th best only need a bound
+            floor = -math.inf
+            if k is not None and len(scored) >= k:
+                floor = sorted((v for v, _ in scored), reverse=True)[k - 1]
 
-            if not ok:
-                break
-            best_value = val
-            best_move = mv
+            board.drop_piece(c, AI)
+            val, _, ok = self.minimax_with_ab(board, depth - 1, False, floor, math.inf, 1, c)
+            board.undo_top(c)
 
-        return best_value, best_move
\ No newline at end of file
+            if not ok:
+                return None
+            if val > floor or floor == -math.inf:
+                scored.append((val, c))
+
+        scored.sort(key=lambda x: x[0], reverse=True)
+        if k is not None:
+            scored = scored[:k]
+
+        lines = []
+        for val, c in scored:
+            board.drop_piece(c, AI)
+            pv = [c] + self.principal_variation(board, depth - 1, False)
+            board.undo_top(c)
+            lines.append((val, c, pv))
+        return lines
+
+    def principal_variation(self, board, depth, maximizing):
+        """Follow transposition-table best moves from this node."""
+        pv = []
+        while depth > 0 and board.check_winner() is None and not board.is_full():
+            player = AI if maximizing else HUMAN
+            tt = self.tt_lookup(board, depth, maximizing)
+            if tt and tt[1] is not None:
+                mv = tt[1]
+            else:
+                # immediate wins return before storing, so look for one directly
+                wins = [c for c in board.valid_moves() if board.is_winning_move(c, player)]
+                if not wins:
+                    break
+                mv = wins[0]
+            board.drop_piece(mv, player)
+            pv.append(mv)
+            depth -= 1
+            maximizing = not maximizing
+
+        for mv in reversed(pv):
+            board.undo_top(mv)
+        return pv
@@ -0,0 +1,104 @@
+"""Perft-style tree enumeration: how big is the unpruned search tree?
+
+For each depth d (1..max_depth) the tree is walked to depth d and one row of
+totals is yielded as soon as that depth is done:
+    nodes      positions visited at plies 0..d
+    leaves     positions at ply d that are not terminal
+    terminals  won or full positions reached at any ply <= d
+    dupes      transpositions skipped (only with dedupe)
+A hard node budget aborts cleanly; the final row then carries aborted=True.
+
+    python perft.py 334 --depth 8 --budget 5000000 --dedupe
+"""
+import argparse
+import time
+from position import board_from_moves
+
+class NodeBudgetExceeded(Exception):
+    pass
+
+
+class Perft:
+    def __init__(self, node_budget=None, dedupe=False):
+        self.node_budget = node_budget
+        self.dedupe = dedupe
+        self.total_nodes = 0
+
+    def run(self, board, max_depth):
+        """Yield a dict of totals per depth; stops early if the node budget runs out."""
+        self.total_nodes = 0
+        previous = None
+        for depth in range(1, max_depth + 1):
+            self.counts = {"nodes": 0, "leaves": 0, "terminals": 0, "dupes": 0}
+            self.seen = set()
+            start = time.time()
+            aborted = False
+            try:
+                self.walk(board, depth)
+            except NodeBudgetExceeded:
+                aborted = True
+            elapsed = time.time() - start
+
+            row = dict(self.counts, depth=depth, time=round(elapsed, 4),
+                       nps=int(self.counts["nodes"] / elapsed) if elapsed > 0 else 0,
+                       aborted=aborted)
+            # effective branching factor, for projecting the next depth
+            row["branching"] = round(row["nodes"] / previous, 2) if previous else None
+            yield row
+            if aborted:
+                return
+            previous = row["nodes"]
+
+    def walk(self, board, depth):
+        if self.node_budget is not None and self.total_nodes >= self.node_budget:
+            raise NodeBudgetExceeded()
+        self.total_nodes += 1
+        self.counts["nodes"] += 1
+
+        if board.last_move_winner() is not None or board.is_full():
+            self.counts["terminals"] += 1
+            return
+        if depth == 0:
+            self.counts["leaves"] += 1
+            return
+
+        for c in board.valid_moves():
+            board.play(c)
+            if self.dedupe:
+                key = board.key()
+                if key in self.seen:
+                    self.counts["dupes"] += 1
+                    board.undo()
+                    continue
+                self.seen.add(key)
+            try:
+                self.walk(board, depth - 1)
+            finally:
+                board.undo()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count the Connect 4 game tree per depth")
+    parser.add_argument("moves", nargs="?", default="", help="starting position as a move string")
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--budget", type=float, help="abort after this many nodes")
+    parser.add_argument("--dedupe", action="store_true", help="skip transpositions")
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--cols", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    board = board_from_moves(args.moves, args.rows, args.cols)
+    perft = Perft(int(args.budget) if args.budget else None, args.dedupe)
+
+    print(f"{'depth':>5} {'nodes':>12} {'leaves':>12} {'terminals':>10} {'dupes':>10} "
+          f"{'branch':>7} {'time':>9} {'nps':>9}")
+    for row in perft.run(board, args.depth):
+        branching = row["branching"] if row["branching"] is not None else "-"
+        print(f"{row['depth']:>5} {row['nodes']:>12} {row['leaves']:>12} {row['terminals']:>10} "
+              f"{row['dupes']:>10} {branching:>7} {row['time']:>9} {row['nps']:>9}", flush=True)
+        if row["aborted"]:
+            print(f"node budget of {perft.node_budget} reached; depth {row['depth']} is incomplete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from board import Board, EMPTY, HUMAN, AI
+
+
+def other(player):
+    return HUMAN if player == AI else AI
+
+
+def board_from_moves(moves, rows=6, cols=7, first=HUMAN):
+    """Build a board from a string of 0-based column digits, e.g. "3324"."""
+    for ch in moves:
+        if not ch.isdigit():
+            raise ValueError(f"invalid move {ch!r}")
+    return Board.from_moves(moves, rows, cols, first)
+
+
+def side_to_move(board, first=HUMAN):
+    return first if board.ply % 2 == 0 else other(first)
+
+
+def swap_colors(board):
+    swap = {EMPTY: EMPTY, HUMAN: AI, AI: HUMAN}
+    return Board(board.rows, board.cols, [[swap[v] for v in row] for row in board.grid])
+
+
+def oriented(board, player):
+    """Return a board on which `player` holds the AI pieces.
+
+    Minimax always maximizes for AI, so searching for the other side is done
+    on a colour-swapped copy.
+    """
+    return board.clone() if player == AI else swap_colors(board)
+
+
+# ---------- 64-bit position key ----------
+# Each column uses rows+1 bits: the AI stones plus a marker bit just above the
+# top stone (computed as ai_bits + mask), which makes the key unique per position.
+
+def key_fits(rows, cols):
+    return (rows + 1) * cols <= 64
+
+
+def position_key(board):
+    if not key_fits(board.rows, board.cols):
+        raise ValueError(f"{board.rows}x{board.cols} board does not fit a 64-bit key")
+    return board.key()
+
+
+def board_from_key(key, rows=6, cols=7):
+    if not key_fits(rows, cols):
+        raise ValueError(f"{rows}x{cols} board does not fit a 64-bit key")
+    grid = [[EMPTY] * cols for _ in range(rows)]
+    column_mask = (1 << (rows + 1)) - 1
+    for c in range(cols):
+        v = (key >> (c * (rows + 1))) & column_mask
+        height = (v + 1).bit_length() - 1
+        ai_bits = v - ((1 << height) - 1)
+        if height > rows:
+            raise ValueError(f"invalid key {key:#x}")
+        for i in range(height):
+            grid[rows - 1 - i][c] = AI if ai_bits >> i & 1 else HUMAN
+    return Board(rows, cols, grid)
+
+
+def parse_position(text, rows=6, cols=7):
+    """Parse either a move string ("3324") or a key ("key:0x1f" / "key:31")."""
+    text = text.strip()
+    if text.startswith("key:"):
+        return board_from_key(int(text[4:], 0), rows, cols)
+    return board_from_moves(text, rows, cols)
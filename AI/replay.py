@@ -0,0 +1,77 @@
+"""Rebuild search trees after the fact from a SearchFingerprint.
+
+With Minimax.record_fingerprints set (and a NullRecorder), live moves record
+no tree at all; replay_tree reruns the search deterministically from the
+fingerprint and returns the same ENTER/LEAF/PRUNED/TT-HIT lines the live
+TreeRecorder would have produced for the last completed depth. Replays are
+plain functions of picklable data, so they can run in a background process:
+
+    future = pool.submit(replay_tree, minimax.last_fingerprint)
+"""
+from board import Board
+from minimax import Minimax, SearchFingerprint
+from ordering import MoveOrderer
+from TreeRecorder import TreeRecorder
+from tree import TreeTXT
+
+
+class RecordedCache:
+    """Stands in for the AnalysisCache, answering probes in the recorded order."""
+
+    def __init__(self, probes, min_depth):
+        self.probes = iter(probes)
+        self.min_depth = min_depth
+
+    def probe(self, board, maximizing, weights):
+        return next(self.probes, None)
+
+    def store(self, *entry):
+        pass
+
+    def flush(self):
+        pass
+
+
+def replay_tree(fingerprint):
+    """Return the recorder lines of the search described by `fingerprint`."""
+    recorder = TreeRecorder()
+    if fingerprint.shortcut:
+        recorder.node(*fingerprint.shortcut)
+        return recorder.lines
+    if fingerprint.completed_depth == 0:
+        return []
+
+    cache = None
+    if fingerprint.cache_probes is not None:
+        cache = RecordedCache(fingerprint.cache_probes, fingerprint.cache_min_depth)
+    minimax = Minimax(recorder, cache)
+    h = minimax.h
+    h.W4, h.W3, h.W2, h.opp_W3, h.center_weight = fingerprint.weights
+    minimax.orderer = MoveOrderer(h)
+    minimax.max_tt_entries = fingerprint.max_tt_entries
+    # only the entries the live search touched; the rest still count toward max_tt_entries
+    minimax.transposition = dict(fingerprint.tt_entries)
+    minimax.tt_absent = fingerprint.tt_size - len(fingerprint.tt_entries)
+
+    # run the same iterations as the live search and stop after its last completed depth
+    def stop_after(depth, value, move):
+        if depth == fingerprint.completed_depth:
+            minimax.stop_requested = True
+    minimax.on_iteration = stop_after
+
+    board = Board(fingerprint.rows, fingerprint.cols, fingerprint.grid)
+    minimax.find_best_move(board, fingerprint.max_depth, fingerprint.use_ab)
+    return recorder.lines
+
+
+def tree_lines(tree):
+    """Recorder lines from either a fingerprint (replayed now) or lines recorded live."""
+    if isinstance(tree, SearchFingerprint):
+        return replay_tree(tree)
+    return tree
+
+
+def save_tree(tree, filename):
+    """Replay if needed and write the tree file; safe to run in a worker process."""
+    TreeTXT().save(tree_lines(tree), filename)
+    return filename
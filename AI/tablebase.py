@@ -0,0 +1,239 @@
+"""Exhaustively solved tablebases for small boards.
+
+The generator walks every position reachable from the empty board and solves
+it exactly, writing each result straight into an open-addressing hash table
+with one 64-bit entry per position:
+
+    entry = (key + 1) << 8 | result << 6 | distance
+
+where key is the position seen from the side to move (mover stones + mask),
+result is LOSS/DRAW/WIN for the side to move and distance counts plies to the
+end of the game under best play. The file is memory-mapped when probed, so a
+lookup is a hash and a few array reads.
+
+    python tablebase.py 4 5            # writes tb_4x5.bin
+
+Table sizes: 4x4 has 134k positions (4 MB, about a second), 4x5 3.1M (64 MB,
+25s) and 5x5 51M (1 GB, 6 minutes, 1.5 GB peak memory while the table grows).
+5x6 fits the entry format, but at billions of positions it needs tens of GB.
+"""
+import argparse
+import mmap
+import struct
+import sys
+import time
+from array import array
+from board import AI
+from position import other
+
+LOSS, DRAW, WIN = 0, 1, 2
+MAGIC = b"C4TB"
+HEADER = struct.Struct("<4sBBBxQ")  # magic, rows, cols, table bits, count
+GOLDEN = 0x9E3779B97F4A7C15
+MASK64 = (1 << 64) - 1
+
+
+def mover_key(board, mover):
+    mover_bits = board.ai_bits if mover == AI else board.mask ^ board.ai_bits
+    return mover_bits + board.mask
+
+
+def supported(rows, cols):
+    # 56 bits for key + 1 and 6 bits of distance
+    return (rows + 1) * cols <= 55 and rows * cols < 64
+
+
+def rank(result, distance):
+    # win fast, lose slow
+    if result == WIN:
+        return (2, -distance)
+    if result == LOSS:
+        return (0, distance)
+    return (1, 0)
+
+
+def flip(result):
+    return 2 - result
+
+
+class TableWriter:
+    """The packed table, filled while solving and written to disk once at the end.
+
+    Results go straight into a flat array of 64-bit entries, so memory use is 8
+    bytes per slot rather than a Python dict entry and tuple per position. When
+    the table gets half full it is rehashed into one twice the size.
+    """
+
+    def __init__(self, rows, cols, bits=16):
+        self.rows, self.cols = rows, cols
+        self.count = 0
+        self.resize(bits)
+
+    def resize(self, bits):
+        self.bits = bits
+        self.table = array("Q", bytes(8 << bits))
+        self.limit = 1 << (bits - 1)  # load factor <= 0.5
+
+    def get(self, key):
+        """The stored entry for key, or 0."""
+        table, tag, size = self.table, key + 1, (1 << self.bits) - 1
+        slot = ((key * GOLDEN) & MASK64) >> (64 - self.bits)
+        while True:
+            entry = table[slot]
+            if entry == 0 or entry >> 8 == tag:
+                return entry
+            slot = (slot + 1) & size
+
+    def put(self, key, result, distance):
+        self.insert((key + 1) << 8 | result << 6 | distance)
+        self.count += 1
+        if self.count > self.limit:
+            old = self.table
+            self.resize(self.bits + 1)
+            for entry in old:
+                if entry:
+                    self.insert(entry)
+
+    def insert(self, entry):
+        table, size = self.table, (1 << self.bits) - 1
+        slot = ((((entry >> 8) - 1) * GOLDEN) & MASK64) >> (64 - self.bits)
+        while table[slot]:
+            slot = (slot + 1) & size
+        table[slot] = entry
+
+    def write(self, path):
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.rows, self.cols, self.bits, self.count))
+            self.table.tofile(f)
+        return HEADER.size + 8 * len(self.table)
+
+
+class Solver:
+    """Exhaustive negamax on bitboards, storing every position it solves in a TableWriter.
+
+    A position is (mover, mask): the stones of the side to move and all stones,
+    laid out like Board.mask, so mover + mask is mover_key() of the same position.
+    """
+
+    def __init__(self, rows, cols, table):
+        self.table = table
+        h = rows + 1
+        self.columns = [(((1 << rows) - 1) << c * h, 1 << c * h) for c in range(cols)]
+        self.full = sum(column for column, _ in self.columns)
+        self.shifts = (1, h, h - 1, h + 1)  # vertical, horizontal, both diagonals
+
+    def connects(self, stones):
+        for s in self.shifts:
+            pairs = stones & (stones >> s)
+            if pairs & (pairs >> 2 * s):
+                return True
+        return False
+
+    def solve(self, mover, mask):
+        """(result, distance) for the side to move; the position must not be over."""
+        key = mover + mask
+        entry = self.table.get(key)
+        if entry:
+            return (entry >> 6) & 3, entry & 63
+
+        best = None
+        opponent = mover ^ mask
+        # every child is visited, winning moves included, so any reachable position can be probed
+        for column, bottom in self.columns:
+            landing = (mask + bottom) & column
+            if not landing:
+                continue
+            if self.connects(mover | landing):
+                mine = (WIN, 1)
+            elif mask | landing == self.full:
+                mine = (DRAW, 1)
+            else:
+                result, distance = self.solve(opponent, mask | landing)
+                mine = (flip(result), distance + 1)
+            if best is None or rank(*mine) > rank(*best):
+                best = mine
+
+        self.table.put(key, *best)
+        return best
+
+
+def generate(rows, cols, path=None, verbose=True):
+    if not supported(rows, cols):
+        raise ValueError(f"{rows}x{cols} is too large for a tablebase")
+    path = path or f"tb_{rows}x{cols}.bin"
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), rows * cols + 100))
+
+    start = time.time()
+    table = TableWriter(rows, cols)
+    root = Solver(rows, cols, table).solve(0, 0)
+    if verbose:
+        print(f"solved {table.count} positions in {time.time() - start:.1f}s; "
+              f"empty board: {('loss', 'draw', 'win')[root[0]]} in {root[1]}")
+    size = table.write(path)
+    if verbose:
+        print(f"wrote {path} ({size} bytes)")
+    return path
+
+
+class Tablebase:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, self.cols, self.bits, self.count = HEADER.unpack_from(self.mm)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a tablebase")
+        self.table = memoryview(self.mm)[HEADER.size:].cast("Q")
+        self.size = 1 << self.bits
+
+    def covers(self, board):
+        return board.rows == self.rows and board.cols == self.cols
+
+    def probe(self, board, mover):
+        """(result, distance) for `mover` to play, or None if the position is not stored."""
+        key = mover_key(board, mover)
+        tag = key + 1
+        slot = ((key * GOLDEN) & MASK64) >> (64 - self.bits)
+        while True:
+            entry = self.table[slot]
+            if entry == 0:
+                return None
+            if entry >> 8 == tag:
+                return (entry >> 6) & 3, entry & 63
+            slot = (slot + 1) & (self.size - 1)
+
+    def best_move(self, board, mover):
+        """(result, distance, move) with perfect play, or None if a child is missing."""
+        best = None
+        for c in board.valid_moves():
+            if board.is_winning_move(c, mover):
+                return WIN, 1, c
+            board.play(c, mover)
+            if board.is_full():
+                child = (DRAW, 0)
+            else:
+                child = self.probe(board, other(mover))
+            board.undo()
+            if child is None:
+                return None
+            mine = (flip(child[0]), child[1] + 1)
+            if best is None or rank(*mine) > rank(*best[:2]):
+                best = mine + (c,)
+        return best
+
+    def close(self):
+        self.table.release()
+        self.mm.close()
+        self.file.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a Connect 4 tablebase for a small board")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("cols", type=int)
+    parser.add_argument("-o", "--output", help="output file (default: tb_<rows>x<cols>.bin)")
+    args = parser.parse_args(argv)
+    generate(args.rows, args.cols, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import random
+import unittest
+from board import Board, HUMAN, AI
+from heuristic import heuristic, LookupHeuristic, MAX_TABLE_LENGTH
+
+
+def random_board(rng, rows, cols):
+    board = Board(rows, cols)
+    if rng.random() < 0.5:
+        board.track_lines()  # codes kept from the start as well as rebuilt on first evaluate
+    for _ in range(rng.randrange(rows * cols + 1)):
+        if not board.legal:
+            break
+        board.play(rng.choice(board.legal))
+        if board.last_move_winner() is None and rng.random() < 0.1:
+            board.undo()
+    return board
+
+
+class LookupHeuristicParity(unittest.TestCase):
+    """LookupHeuristic must score exactly like heuristic.evaluate."""
+
+    SIZES = [(6, 7), (4, 4), (5, 6), (4, 2), (7, 9), (6, 12), (12, 6), (6, 16)]
+
+    def check(self, lookup, rng, sizes, count):
+        plain = heuristic()
+        plain.__dict__.update(lookup.__dict__)
+        for rows, cols in sizes:
+            for _ in range(count):
+                board = random_board(rng, rows, cols)
+                for player in (HUMAN, AI):
+                    self.assertEqual(plain.evaluate(board, player), lookup.evaluate(board, player),
+                                     f"{rows}x{cols} {board.moves} player {player}")
+
+    def test_default_weights(self):
+        self.check(LookupHeuristic(), random.Random(1), self.SIZES, 200)
+
+    def test_long_lines_are_chunked(self):
+        self.assertTrue(any(max(size) > MAX_TABLE_LENGTH for size in self.SIZES))
+        self.check(LookupHeuristic(), random.Random(2), [(MAX_TABLE_LENGTH + 9, MAX_TABLE_LENGTH + 5)], 50)
+
+    def test_other_weights(self):
+        lookup = LookupHeuristic()
+        lookup.W3, lookup.W2, lookup.center_weight = 1, 500, 7
+        self.check(lookup, random.Random(3), [(6, 7), (6, 12)], 200)
+
+    def test_board_sizes_do_not_share_tables(self):
+        lookup = LookupHeuristic()
+        self.check(lookup, random.Random(4), [(4, 7), (4, 2), (7, 4)], 20)
+
+    def test_moves_after_evaluate_keep_codes_in_step(self):
+        rng = random.Random(5)
+        lookup, plain = LookupHeuristic(), heuristic()
+        board = Board()
+        lookup.evaluate(board, AI)
+        while board.legal and board.last_move_winner() is None:
+            board.play(rng.choice(board.legal))
+            clone = board.clone()
+            self.assertEqual(plain.evaluate(clone, AI), lookup.evaluate(clone, AI))
+            board.undo()
+            self.assertEqual(plain.evaluate(board, HUMAN), lookup.evaluate(board, HUMAN))
+            board.play(rng.choice(board.legal))
+
+
+if __name__ == "__main__":
+    unittest.main()